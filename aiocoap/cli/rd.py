@@ -30,7 +30,12 @@ import logging
 import asyncio
 import argparse
 from urllib.parse import urljoin
+import functools
+import operator
+import heapq
 import itertools
+import re
+import collections
 
 import aiocoap
 from aiocoap.resource import Site, Resource, ObservableResource, PathCapable, WKCResource, link_format_to_message
@@ -44,11 +49,28 @@ import aiocoap.proxy.server
 
 from aiocoap.util.linkformat import Link, LinkFormat, parse
 from ..util.asyncio import py38args
+from ..util.asyncio.timeoutwheel import TimeoutWheel
 
 import link_header
 
 IMMUTABLE_PARAMETERS = ('ep', 'd', 'proxy')
 
+# Registrations share few distinct bases and targets, and resolving them is
+# comparatively expensive
+_urljoin = functools.lru_cache(maxsize=4096)(urljoin)
+
+class _BasedLink(Link):
+    """A link as produced by Registration.get_based_links, which additionally
+    indexes its attribute values by key in values_by_key.
+
+    These links are never modified after construction, so the index can not
+    go stale."""
+    def __init__(self, href, attr_pairs):
+        super().__init__(href, attr_pairs)
+        self.values_by_key = {}
+        for (k, v) in self.attr_pairs:
+            self.values_by_key.setdefault(k, []).append(v)
+
 def query_split(msg):
     """Split a message's query up into (key, [*value]) pairs from a
     ?key=value&key2=value2 style Uri-Query options.
@@ -61,14 +83,11 @@ def query_split(msg):
     {'k1': ['v1.1', 'v1.2'], 'obs': [None]}
     """
     result = {}
+    setdefault = result.setdefault
     for q in msg.opt.uri_query:
-        if '=' not in q:
-            k = q
-            # matching the representation in link_header
-            v = None
-        else:
-            k, v = q.split('=', 1)
-        result.setdefault(k, []).append(v)
+        k, sep, v = q.partition('=')
+        # matching the representation in link_header
+        setdefault(k, []).append(v if sep else None)
     return result
 
 def pop_single_arg(query, name):
@@ -93,7 +112,17 @@ class CommonRD:
         self._by_key = {} # key -> Registration
         self._by_path = {} # path -> Registration
 
+        self._next_path_id = 1
+        self._free_path_ids = [] # heap of ids below _next_path_id that may be reused
+
         self._updated_state_cb = []
+        self._update_pending = False
+        # Incremented on every change, allowing lookups to cache their results
+        self._version = 0
+
+        # Shared by all registrations, as there can be many of them, and their
+        # lifetimes need neither be precise nor are they typically short
+        self._timeouts = TimeoutWheel()
 
         self.proxy_domain = proxy_domain
         self.proxy_active = {} # uri_host -> Remote
@@ -106,15 +135,19 @@ class CommonRD:
         # reactivates it -- preventing premature reuse of the resource URI
         grace_period = 15
 
-        @property
-        def href(self):
-            return '/' + '/'.join(self.path)
+        # There is one of these per registered endpoint
+        __slots__ = ('path', 'href', '_links', '_based_cache', '_delete_cb',
+                '_update_cb', 'registration_parameters', 'lt', 'base',
+                'base_is_explicit', 'proxy_host', '_setproxyremote_cb',
+                '_timeout_wheel', 'timeout')
 
-        def __init__(self, static_registration_parameters, path, network_remote, delete_cb, update_cb, registration_parameters, proxy_host, setproxyremote_cb):
+        def __init__(self, static_registration_parameters, path, network_remote, delete_cb, update_cb, registration_parameters, proxy_host, setproxyremote_cb, timeout_wheel):
             # note that this can not modify d and ep any more, since they are
             # already part of the key and possibly the path
             self.path = path
-            self.links = LinkFormat([])
+            self.href = '/' + '/'.join(path)
+            self._based_cache = None
+            self._links = LinkFormat([])
 
             self._delete_cb = delete_cb
             self._update_cb = update_cb
@@ -126,14 +159,15 @@ class CommonRD:
             self.proxy_host = proxy_host
             self._setproxyremote_cb = setproxyremote_cb
 
+            self._timeout_wheel = timeout_wheel
+
             self.update_params(network_remote, registration_parameters, is_initial=True)
 
-        def update_params(self, network_remote, registration_parameters, is_initial=False):
-            """Set the registration_parameters from the parsed query arguments,
-            update any effects of them, and and trigger any observation
-            observation updates if requried (the typical ones don't because
-            their registration_parameters are {} and all it does is restart the
-            lifetime counter)"""
+        @staticmethod
+        def check_params(registration_parameters):
+            """Raise BadRequest if the registration_parameters (which are not
+            modified) could not be applied to a registration for reasons that
+            do not depend on its state or the network remote"""
 
             if any(k in ('ep', 'd') for k in registration_parameters.keys()):
                 # The ep and d of initial registrations are already popped out
@@ -144,6 +178,25 @@ class CommonRD:
                     registration_parameters.keys()):
                 raise error.BadRequest("Unsuitable parameter for registration")
 
+            registration_parameters = dict(registration_parameters)
+
+            if 'lt' in registration_parameters:
+                try:
+                    int(pop_single_arg(registration_parameters, 'lt'))
+                except ValueError:
+                    raise error.BadRequest("lt must be numeric")
+
+            pop_single_arg(registration_parameters, 'base')
+
+        def update_params(self, network_remote, registration_parameters, is_initial=False):
+            """Set the registration_parameters from the parsed query arguments,
+            update any effects of them, and and trigger any observation
+            observation updates if requried (the typical ones don't because
+            their registration_parameters are {} and all it does is restart the
+            lifetime counter)"""
+
+            self.check_params(registration_parameters)
+
             if (is_initial or not self.base_is_explicit) and 'base' not in \
                     registration_parameters:
                 # check early for validity to avoid side effects of requests
@@ -168,10 +221,7 @@ class CommonRD:
             set_base = None
 
             if 'lt' in registration_parameters:
-                try:
-                    set_lt = int(pop_single_arg(registration_parameters, 'lt'))
-                except ValueError:
-                    raise error.BadRequest("lt must be numeric")
+                set_lt = int(pop_single_arg(registration_parameters, 'lt'))
 
             if 'base' in registration_parameters:
                 set_base = pop_single_arg(registration_parameters, 'base')
@@ -183,10 +233,12 @@ class CommonRD:
                 actual_change = True
                 self.base = set_base
                 self.base_is_explicit = True
+                self._based_cache = None
 
             if not self.base_is_explicit and (is_initial or self.base != network_base):
                 self.base = network_base
                 actual_change = True
+                self._based_cache = None
 
             if any(v != self.registration_parameters.get(k) for (k, v) in registration_parameters.items()):
                 self.registration_parameters.update(registration_parameters)
@@ -203,22 +255,17 @@ class CommonRD:
             if self.proxy_host:
                 self._setproxyremote_cb(network_remote)
 
-        def delete(self):
+        def delete(self, keep_path=False):
+            """Remove the registration. With keep_path, its path is not
+            made available to new registrations, as it is about to be reused
+            for a re-registration of the same endpoint."""
             self.timeout.cancel()
             self._update_cb()
-            self._delete_cb()
+            self._delete_cb(keep_path)
 
         def _set_timeout(self):
             delay = self.lt + self.grace_period
-            # workaround for python issue20493
-
-            async def longwait(delay, callback):
-                await asyncio.sleep(delay)
-                callback()
-            self.timeout = asyncio.create_task(
-                    longwait(delay, self.delete),
-                    **py38args(name="RD Timeout for %r" % self)
-                    )
+            self.timeout = self._timeout_wheel.call_later(delay, self.delete)
 
         def refresh_timeout(self):
             self.timeout.cancel()
@@ -231,23 +278,40 @@ class CommonRD:
                     attr_pairs.append([k, v])
             return Link(href=self.href, attr_pairs=attr_pairs, base=self.base, rt="core.rd-ep")
 
+        @property
+        def links(self):
+            return self._links
+
+        @links.setter
+        def links(self, value):
+            self._links = value
+            self._based_cache = None
+            self._update_cb()
+
         def get_based_links(self):
             """Produce a LinkFormat object that represents all statements in
             the registration, resolved to the registration's base (and thus
-            suitable for comparing anchors)."""
-            result = []
-            for l in self.links.links:
-                href = urljoin(self.base, l.href)
-                if 'anchor' in l:
-                    absanchor = urljoin(self.base, l.anchor)
-                    data = [(k, v) for (k, v) in l.attr_pairs if k != 'anchor'] + [['anchor', absanchor]]
-                else:
-                    data = l.attr_pairs + [['anchor', urljoin(href, '/')]]
-                result.append(Link(href, data))
-            return LinkFormat(result)
+            suitable for comparing anchors).
+
+            The result is cached until the links or the base are changed, and
+            must not be modified by the caller."""
+            if self._based_cache is None:
+                result = []
+                for l in self.links.links:
+                    href = _urljoin(self.base, l.href)
+                    if 'anchor' in l:
+                        absanchor = _urljoin(self.base, l.anchor)
+                        data = [(k, v) for (k, v) in l.attr_pairs if k != 'anchor']
+                        data.append(('anchor', absanchor))
+                    else:
+                        data = list(l.attr_pairs)
+                        data.append(('anchor', _urljoin(href, '/')))
+                    result.append(_BasedLink(href, data))
+                self._based_cache = LinkFormat(result)
+            return self._based_cache
 
     async def shutdown(self):
-        pass
+        self._timeouts.cancel_all()
 
     def register_change_callback(self, callback):
         """Ask RD to invoke the callback whenever any of the RD state
@@ -258,20 +322,44 @@ class CommonRD:
         self._updated_state_cb.append(callback)
 
     def _updated_state(self):
+        self._version += 1
+
+        # Changes often come in bursts (eg. deleting and re-creating a
+        # registration), so they are only reported once per loop iteration.
+        if self._update_pending:
+            return
+        self._update_pending = True
+        asyncio.get_running_loop().call_soon(self._flush_updated_state)
+
+    def _flush_updated_state(self):
+        self._update_pending = False
         for cb in self._updated_state_cb:
             cb()
 
     def _new_pathtail(self):
-        for i in itertools.count(1):
-            # In the spirit of making legal but unconvential choices (see
-            # StandaloneResourceDirectory documentation): Whoever strips or
-            # ignores trailing slashes shall have a hard time keeping
-            # registrations alive.
-            path = (str(i), '')
-            if path not in self._by_path:
-                return path
-
-    def initialize_endpoint(self, network_remote, registration_parameters):
+        # In the spirit of making legal but unconvential choices (see
+        # StandaloneResourceDirectory documentation): Whoever strips or
+        # ignores trailing slashes shall have a hard time keeping
+        # registrations alive.
+        if self._free_path_ids:
+            return (str(heapq.heappop(self._free_path_ids)), '')
+
+        path = (str(self._next_path_id), '')
+        self._next_path_id += 1
+        return path
+
+    def check_registration_parameters(self, registration_parameters):
+        """Raise BadRequest if initialize_endpoint would reject the
+        registration_parameters (which are not modified) for reasons that do
+        not depend on the network remote"""
+        registration_parameters = dict(registration_parameters)
+        self._pop_endpoint_parameters(registration_parameters)
+        self.Registration.check_params(registration_parameters)
+
+    def _pop_endpoint_parameters(self, registration_parameters):
+        """Remove the parameters that identify the endpoint from
+        registration_parameters, and return the immutable registration
+        parameters, the key and the proxy host name (or None) from them"""
         # copying around for later use in static, but not checking again
         # because reading them from the original will already have screamed by
         # the time this is used
@@ -312,6 +400,22 @@ class CommonRD:
         else:
             proxy_host = None
 
+        return static_registration_parameters, key, proxy_host
+
+    def initialize_endpoint(self, network_remote, registration_parameters):
+        static_registration_parameters, key, proxy_host = \
+                self._pop_endpoint_parameters(registration_parameters)
+
+        self.Registration.check_params(registration_parameters)
+
+        if proxy_host is None and 'base' not in registration_parameters:
+            # Same check as in update_params, but it has to happen before any
+            # path is allocated or an old registration is removed
+            try:
+                network_remote.uri
+            except error.AnonymousHost:
+                raise error.BadRequest("explicit base required")
+
         # No more errors should fly out from below here, as side effects start now
 
         try:
@@ -320,7 +424,7 @@ class CommonRD:
             path = self._new_pathtail()
         else:
             path = oldreg.path[len(self.entity_prefix):]
-            oldreg.delete()
+            oldreg.delete(keep_path=True)
 
         # this was the brutal way towards idempotency (delete and re-create).
         # if any actions based on that are implemented here, they have yet to
@@ -328,8 +432,10 @@ class CommonRD:
         # just ignore them unless something otherwise unchangeable (ep, d)
         # changes.
 
-        def delete():
+        def delete(keep_path):
             del self._by_path[path]
+            if not keep_path:
+                heapq.heappush(self._free_path_ids, int(path[0]))
             del self._by_key[key]
             self.proxy_active.pop(proxy_host, None)
 
@@ -337,7 +443,8 @@ class CommonRD:
             self.proxy_active[proxy_host] = remote
 
         reg = self.Registration(static_registration_parameters, self.entity_prefix + path, network_remote, delete,
-                self._updated_state, registration_parameters, proxy_host, setproxyremote)
+                self._updated_state, registration_parameters, proxy_host, setproxyremote,
+                self._timeouts)
 
         self._by_key[key] = reg
         self._by_path[path] = reg
@@ -347,6 +454,11 @@ class CommonRD:
     def get_endpoints(self):
         return self._by_key.values()
 
+#: Functions that produce a LinkFormat from a message's payload, by content format
+_link_format_parsers = {
+        ContentFormat.LINKFORMAT: lambda message: parse(message.payload.decode('utf8')),
+        }
+
 def link_format_from_message(message):
     """Convert a response message into a LinkFormat object
 
@@ -356,10 +468,11 @@ def link_format_from_message(message):
     if certain_format is None:
         certain_format = message.request.opt.accept
     try:
-        if certain_format == ContentFormat.LINKFORMAT:
-            return parse(message.payload.decode('utf8'))
-        else:
-            raise error.UnsupportedMediaType()
+        parser = _link_format_parsers[certain_format]
+    except KeyError:
+        raise error.UnsupportedMediaType()
+    try:
+        return parser(message)
     except (UnicodeDecodeError, link_header.ParseException):
         raise error.BadRequest()
 
@@ -445,106 +558,184 @@ class RegistrationDispatchSite(ThingWithCommonRD, Resource, PathCapable):
         return await entity.render(request.copy(uri_path=()))
 
 def _paginate(candidates, query):
+    """Pick the page requested in the query out of the candidates iterable,
+    and return it as a list. Candidates after the page are not consumed."""
     page = pop_single_arg(query, 'page')
     count = pop_single_arg(query, 'count')
 
+    if page is None and count is None:
+        return list(candidates)
+
     try:
-        candidates = list(candidates)
-        if page is not None:
-            candidates = candidates[int(page) * int(count):]
-        if count is not None:
-            candidates = candidates[:int(count)]
-    except (KeyError, ValueError):
+        count = int(count)
+        start = (int(page) if page is not None else 0) * count
+    except (TypeError, ValueError):
         raise error.BadRequest("page requires count, and both must be ints")
+    if start < 0 or count < 0:
+        raise error.BadRequest("page and count must not be negative")
 
-    return candidates
+    return list(itertools.islice(candidates, start, start + count))
 
 def _link_matches(link, key, condition):
-    return any(k == key and condition(v) for (k, v) in link.attr_pairs)
+    # link is always one of the _BasedLink from get_based_links
+    return any(map(condition, link.values_by_key.get(key, ())))
+
+def _compile_matcher(kind, search_value):
+    """Build a predicate for a single lookup filter term that tests a single
+    attribute value, taking wildcards and the space separated list semantics
+    of if and rt into account"""
+    is_wildcard = search_value is not None and search_value.endswith('*')
+
+    if kind == 'multi':
+        # Rather than splitting the attribute value into its space separated
+        # tokens and checking each, a single regular expression finds a
+        # matching token anywhere in it.
+        term = search_value[:-1] if is_wildcard else search_value
+        if is_wildcard and term == '':
+            # Any token at all
+            pattern = r'\S'
+        elif term is None or term.split() != [term]:
+            # Tokens are never empty and never contain whitespace
+            return lambda x: False
+        elif is_wildcard:
+            pattern = r'(?<!\S)' + re.escape(term)
+        else:
+            pattern = r'(?<!\S)' + re.escape(term) + r'(?!\S)'
+        return re.compile(pattern).search
+
+    if is_wildcard:
+        start = search_value[:-1]
+        def matches(x):
+            return x.startswith(start)
+    else:
+        matches = functools.partial(operator.eq, search_value)
+
+    return matches
+
+def _filter_kind(search_key):
+    if search_key == 'href':
+        return 'href'
+    if search_key in ('if', 'rt'):
+        return 'multi'
+    return 'plain'
+
+def _compile_filters(query):
+    """Turn the output of query_split into a tuple of (kind, search_key,
+    matcher) tuples, all of which need to match for a candidate to be
+    selected. The kind is 'href' for filters on the link target, 'multi' for
+    attributes that contain space separated values, and 'plain' for all
+    others.
+
+    Pagination arguments are left in the query to be processed last."""
+    return _compile_filter_terms(tuple(
+            (search_key, tuple(search_values))
+            for (search_key, search_values) in query.items()
+            if search_key not in ('page', 'count')
+            ))
+
+@functools.lru_cache(maxsize=128)
+def _compile_filter_terms(terms):
+    """Compile filters from a hashable representation of the query, so that
+    lookups repeated by many clients (or on every observation notification)
+    do not build their matchers over and over"""
+    filters = []
+    for (search_key, search_values) in terms:
+        kind = _filter_kind(search_key)
+        for search_value in search_values:
+            filters.append((kind, search_key, _compile_matcher(kind, search_value)))
+    return tuple(filters)
+
+class LookupInterface(ThingWithCommonRD, ObservableResource):
+    """Common base of the lookup interfaces that keeps the results of recent
+    queries until anything in the RD changes, which serves repeated lookups
+    and the re-rendering for observation notifications of different clients
+    with the same query"""
+
+    #: Number of distinct queries whose results are kept
+    cache_size = 64
 
-class EndpointLookupInterface(ThingWithCommonRD, ObservableResource):
-    ct = link_format_to_message.supported_ct
-    rt = "core.rd-lookup-ep"
+    def __init__(self, common_rd):
+        super().__init__(common_rd)
+
+        self._cache = collections.OrderedDict() # query key -> LinkFormat
+        self._cache_version = None # CommonRD._version the _cache is valid for
+
+    def _lookup(self, query):
+        """Produce a LinkFormat object with the lookup results for the output
+        of query_split"""
+        raise NotImplementedError
 
     async def render_get(self, request):
         query = query_split(request)
 
-        candidates = self.common_rd.get_endpoints()
+        if self._cache_version != self.common_rd._version:
+            self._cache.clear()
+            self._cache_version = self.common_rd._version
 
-        for search_key, search_values in query.items():
-            if search_key in ('page', 'count'):
-                continue # filtered last
+        key = frozenset((k, tuple(v)) for (k, v) in query.items())
+        try:
+            result = self._cache[key]
+        except KeyError:
+            result = self._lookup(query)
+            self._cache[key] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
 
-            for search_value in search_values:
-                if search_value is not None and search_value.endswith('*'):
-                    def matches(x, start=search_value[:-1]):
-                        return x.startswith(start)
-                else:
-                    def matches(x, search_value=search_value):
-                        return x == search_value
+        # Serialized only now, as this depends on the request's Accept option
+        return link_format_to_message(request, result)
 
-                if search_key in ('if', 'rt'):
-                    def matches(x, original_matches=matches):
-                        return any(original_matches(v) for v in x.split())
+class EndpointLookupInterface(LookupInterface):
+    ct = link_format_to_message.supported_ct
+    rt = "core.rd-lookup-ep"
+
+    @staticmethod
+    def _matches(endpoint, kind, search_key, matches):
+        # Registration parameters are checked first, as they are cheaper to
+        # access than the endpoint's links
+        if kind == 'href':
+            return matches(endpoint.href) or \
+                    any(matches(r.href) for r in endpoint.get_based_links().links)
 
-                if search_key == 'href':
-                    candidates = (c for c in candidates if
-                            matches(c.href) or
-                            any(matches(r.href) for r in c.get_based_links().links)
-                            )
-                    continue
+        return (search_key in endpoint.registration_parameters and
+                    any(map(matches, endpoint.registration_parameters[search_key]))) or \
+                any(_link_matches(r, search_key, matches) for r in endpoint.get_based_links().links)
 
-                candidates = (c for c in candidates if
-                        (search_key in c.registration_parameters and any(matches(x) for x in c.registration_parameters[search_key])) or
-                        any(_link_matches(r, search_key, matches) for r in c.get_based_links().links)
-                        )
+    def _lookup(self, query):
+        filters = _compile_filters(query)
+
+        candidates = (c for c in self.common_rd.get_endpoints()
+                if all(self._matches(c, kind, search_key, matches)
+                    for (kind, search_key, matches) in filters))
 
         candidates = _paginate(candidates, query)
 
         result = [c.get_host_link() for c in candidates]
 
-        return link_format_to_message(request, LinkFormat(result))
+        return LinkFormat(result)
 
-class ResourceLookupInterface(ThingWithCommonRD, ObservableResource):
+class ResourceLookupInterface(LookupInterface):
     ct = link_format_to_message.supported_ct
     rt = "core.rd-lookup-res"
 
-    async def render_get(self, request):
-        query = query_split(request)
-
-        eps = self.common_rd.get_endpoints()
-        candidates = ((e, c) for e in eps for c in e.get_based_links().links)
-
-        for search_key, search_values in query.items():
-            if search_key in ('page', 'count'):
-                continue # filtered last
-
-            for search_value in search_values:
-                if search_value is not None and search_value.endswith('*'):
-                    def matches(x, start=search_value[:-1]):
-                        return x.startswith(start)
-                else:
-                    def matches(x, search_value=search_value):
-                        return x == search_value
-
-                if search_key in ('if', 'rt'):
-                    def matches(x, original_matches=matches):
-                        return any(original_matches(v) for v in x.split())
+    @staticmethod
+    def _matches(endpoint, link, kind, search_key, matches):
+        if kind == 'href':
+            return matches(link.href) or \
+                    matches(endpoint.href) # FIXME: They SHOULD give this as relative as we do, but don't have to
 
-                if search_key == 'href':
-                    candidates = ((e, c) for (e, c) in candidates if
-                            matches(c.href) or
-                            matches(e.href) # FIXME: They SHOULD give this as relative as we do, but don't have to
-                            )
-                    continue
+        return _link_matches(link, search_key, matches) or \
+                (search_key in endpoint.registration_parameters and
+                    any(map(matches, endpoint.registration_parameters[search_key])))
 
-                candidates = ((e, c) for (e, c) in candidates if
-                        _link_matches(c, search_key, matches) or
-                        (search_key in e.registration_parameters and any(matches(x) for x in e.registration_parameters[search_key]))
-                        )
+    def _lookup(self, query):
+        filters = _compile_filters(query)
 
-        # strip endpoint
-        candidates = (c for (e, c) in candidates)
+        candidates = (c for e in self.common_rd.get_endpoints()
+                for c in e.get_based_links().links
+                if all(self._matches(e, c, kind, search_key, matches)
+                    for (kind, search_key, matches) in filters))
 
         candidates = _paginate(candidates, query)
 
@@ -555,7 +746,7 @@ class ResourceLookupInterface(ThingWithCommonRD, ObservableResource):
                 else l
                 for l in candidates]
 
-        return link_format_to_message(request, LinkFormat(candidates))
+        return LinkFormat(candidates)
 
 class SimpleRegistration(ThingWithCommonRD, Resource):
     #: Issue a custom warning when registrations come in via this interface
@@ -565,20 +756,42 @@ class SimpleRegistration(ThingWithCommonRD, Resource):
         super().__init__(common_rd)
         self.context = context
 
+        self._in_flight = {} # (network remote, parameters) -> task processing the registration
+
     async def render_post(self, request):
         query = query_split(request)
 
         if 'base' in query:
             raise error.BadRequest("base is not allowed in simple registrations")
 
-        await self.process_request(
-                network_remote=request.remote,
-                registration_parameters=query,
-            )
+        network_remote = request.remote
+
+        # Errors from fetching can not be rendered into the response any
+        # more, so everything that does not depend on the fetched links is
+        # checked up front.
+        self.common_rd.check_registration_parameters(query)
+        get = self._build_fetch(network_remote, query)
+
+        # Taken before the query is consumed by the registration
+        in_flight_key = (network_remote, frozenset((k, tuple(v)) for (k, v) in query.items()))
+        if in_flight_key in self._in_flight:
+            # Not starting a second fetch for an identical request; the
+            # registration that is already being performed will represent the
+            # endpoint's current .well-known/core just as well.
+            logging.info("Ignoring simple registration of %r while an identical one is still in progress", network_remote)
+        else:
+            task = asyncio.create_task(
+                    self.process_request(network_remote, query, get),
+                    **py38args(name="Simple registration of %r" % network_remote)
+                    )
+            self._in_flight[in_flight_key] = task
+            task.add_done_callback(lambda _, key=in_flight_key: self._in_flight.pop(key))
 
         return aiocoap.Message(code=aiocoap.CHANGED)
 
-    async def process_request(self, network_remote, registration_parameters):
+    def _build_fetch(self, network_remote, registration_parameters):
+        """Create the request by which the registering endpoint's
+        .well-known/core is fetched"""
         if 'proxy' not in registration_parameters:
             try:
                 network_base = network_remote.uri
@@ -595,16 +808,32 @@ class SimpleRegistration(ThingWithCommonRD, Resource):
         get.code = aiocoap.GET
         get.opt.accept = ContentFormat.LINKFORMAT
 
-        # not trying to catch anything here -- the errors are most likely well renderable into the final response
-        response = await self.context.request(get).response_raising
-        links = link_format_from_message(response)
+        return get
 
-        if self.registration_warning:
-            # Conveniently placed so it could be changed to something setting
-            # additional registration_parameters instead
-            logging.warning("Warning from registration: %s", self.registration_warning)
-        registration = self.common_rd.initialize_endpoint(network_remote, registration_parameters)
-        registration.links = links
+    async def process_request(self, network_remote, registration_parameters, get):
+        # The response has already been sent, so all that can be done about
+        # errors is to report them locally.
+        try:
+            response = await self.context.request(get).response_raising
+            links = link_format_from_message(response)
+
+            if self.registration_warning:
+                # Conveniently placed so it could be changed to something setting
+                # additional registration_parameters instead
+                logging.warning("Warning from registration: %s", self.registration_warning)
+            registration = self.common_rd.initialize_endpoint(network_remote, registration_parameters)
+            registration.links = links
+        except error.Error as e:
+            logging.warning("Simple registration of %r failed: %s", network_remote, e)
+        except Exception:
+            logging.exception("Simple registration of %r failed", network_remote)
+
+    async def shutdown(self):
+        """Cancel all registrations that are still being processed"""
+        tasks = list(self._in_flight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
 class SimpleRegistrationWKC(WKCResource, SimpleRegistration):
     def __init__(self, listgenerator, common_rd, context):
@@ -631,8 +860,12 @@ class StandaloneResourceDirectory(Proxy, Site):
 
         common_rd = CommonRD(**kwargs)
 
-        self.add_resource([".well-known", "core"], SimpleRegistrationWKC(self.get_resources_as_linkheader, common_rd=common_rd, context=context))
-        self.add_resource([".well-known", "rd"], SimpleRegistration(common_rd=common_rd, context=context))
+        self._simple_registrations = [
+                SimpleRegistrationWKC(self.get_resources_as_linkheader, common_rd=common_rd, context=context),
+                SimpleRegistration(common_rd=common_rd, context=context),
+                ]
+        self.add_resource([".well-known", "core"], self._simple_registrations[0])
+        self.add_resource([".well-known", "rd"], self._simple_registrations[1])
 
         self.add_resource(self.rd_path, DirectoryResource(common_rd=common_rd))
         if list(self.rd_path) != ["rd"] and lwm2m_compat is None:
@@ -658,6 +891,8 @@ class StandaloneResourceDirectory(Proxy, Site):
         return request
 
     async def shutdown(self):
+        for simple_registration in self._simple_registrations:
+            await simple_registration.shutdown()
         await self.common_rd.shutdown()
 
     async def render(self, request):
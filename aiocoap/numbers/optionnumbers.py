@@ -62,7 +62,11 @@ class OptionNumber(ExtensibleIntEnum):
     def __add__(self, delta):
         """Addition makes sense on these due to the delta encoding in CoAP
         serialization"""
-        return type(self)(int(self) + delta)
+        value = int(self) + delta
+        existing = self._value2member_map_.get(value)
+        if existing is not None:
+            return existing
+        return type(self)(value)
 
     def is_critical(self):
         return self & 0x01 == 0x01
@@ -23,8 +23,6 @@ API even in the limited fashion stated above.
     aiocoap.util.*
 """
 
-import urllib.parse
-
 class ExtensibleEnumMeta(type):
     """Metaclass for ExtensibleIntEnum, see there for detailed explanations"""
     def __init__(self, name, bases, dict):
@@ -44,11 +42,16 @@ class ExtensibleEnumMeta(type):
         type.__init__(self, name, bases, dict)
 
     def __call__(self, value):
+        # This is called for every option number and code that is decoded, so
+        # the common case of an already known value is served first.
+        existing = self._value2member_map_.get(value)
+        if existing is not None:
+            return existing
         if isinstance(value, self):
             return value
-        if value not in self._value2member_map_:
-            self._value2member_map_[value] = super(ExtensibleEnumMeta, self).__call__(value)
-        return self._value2member_map_[value]
+        instance = type.__call__(self, value)
+        self._value2member_map_[value] = instance
+        return instance
 
 class ExtensibleIntEnum(int, metaclass=ExtensibleEnumMeta):
     """Similar to Python's enum.IntEnum, this type can be used for named
@@ -82,14 +85,12 @@ def hostportjoin(host, port=None):
     >>> hostportjoin('[2001:db8::1]', 1234)
     '[2001:db8::1]:1234'
     """
-    if ':' in host and not (host.startswith('[') and host.endswith(']')):
-        host = '[%s]'%host
+    if host[:1] != '[' and ':' in host:
+        host = f'[{host}]'
 
     if port is None:
-        hostinfo = host
-    else:
-        hostinfo = "%s:%d"%(host, port)
-    return hostinfo
+        return host
+    return f'{host}:{port:d}'
 
 def hostportsplit(hostport):
     """Like urllib.parse.splitport, but return port as int, and as None if not
@@ -101,18 +102,51 @@ def hostportsplit(hostport):
     ('foo', 5683)
     >>> hostportsplit('[::1%eth0]:56830')
     ('::1%eth0', 56830)
+
+    As with the hostname of a parsed URI, host names are normalized to lower
+    case (but zone identifiers are not), and an absent host is None:
+
+    >>> hostportsplit('Example.COM')
+    ('example.com', None)
+    >>> hostportsplit(':5683')
+    (None, 5683)
+    >>> hostportsplit('::1')
+    Traceback (most recent call last):
+    ...
+    ValueError: Could not parse network location. Beware that when IPv6 literals are expressed in URIs, they need to be put in square brackets to distinguish them from port numbers.
     """
 
-    pseudoparsed = urllib.parse.SplitResult(None, hostport, None, None, None)
-    try:
-        return pseudoparsed.hostname, pseudoparsed.port
-    except ValueError:
-        if '[' not in hostport and hostport.count(':') > 1:
+    # This is called for every request to an unresolved remote, so rather than
+    # going through urllib.parse.SplitResult, it is parsed directly.
+    if hostport.startswith('['):
+        host, bracket, port = hostport[1:].partition(']')
+        if not bracket or (port and port[0] != ':'):
+            raise ValueError("Could not parse network location: %r" % hostport)
+        port = port[1:]
+    else:
+        host, _, port = hostport.partition(':')
+        if ':' in port:
             raise ValueError("Could not parse network location. "
                 "Beware that when IPv6 literals are expressed in URIs, they "
                 "need to be put in square brackets to distinguish them from "
                 "port numbers.")
-        raise
+
+    if host:
+        host, percent, zone = host.partition('%')
+        host = host.lower() + percent + zone
+    else:
+        host = None
+
+    if port:
+        if not (port.isdigit() and port.isascii()):
+            raise ValueError("Port could not be cast to integer value as %r" % port)
+        port = int(port)
+        if port > 65535:
+            raise ValueError("Port out of range 0-65535")
+    else:
+        port = None
+
+    return host, port
 
 def quote_nonascii(s):
     """Like urllib.parse.quote, but explicitly only escaping non-ascii characters.
@@ -129,6 +163,9 @@ class Sentinel:
     """Class for sentinel that can only be compared for identity. No efforts
     are taken to make these singletons; it is up to the users to always refer
     to the same instance, which is typically defined on module level."""
+
+    __slots__ = ('_label',)
+
     def __init__(self, label):
         self._label = label
 
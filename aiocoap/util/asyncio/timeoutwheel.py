@@ -0,0 +1,129 @@
+# This file is part of the Python aiocoap library project.
+#
+# Copyright (c) 2012-2014 Maciej Wasilak <http://sixpinetrees.blogspot.com/>,
+#               2013-2014 Christian Amsüss <c.amsuess@energyharvesting.at>
+#
+# aiocoap is free software, this file is published under the MIT license as
+# described in the accompanying LICENSE file.
+
+import asyncio
+import heapq
+import math
+
+class TimeoutWheel:
+    """A scheduler for many coarse timeouts that are frequently refreshed,
+    like the lifetimes of resource directory registrations.
+
+    Callbacks are sorted into buckets of ``granularity`` seconds, and a single
+    timer on the event loop runs all callbacks of a bucket once it is due. The
+    callbacks may thus run up to ``granularity`` later than requested, but not
+    earlier. Scheduling into a bucket that already exists, and cancelling, do
+    not touch the event loop's timers at all.
+
+    This is not thread safe.
+    """
+
+    def __init__(self, granularity: float = 1):
+        self.granularity = granularity
+        """Width of the buckets in seconds
+
+        Changes to this only take effect after all current timeouts expired."""
+
+        self._buckets = {}
+        """Bucket number -> set of handles due at its start
+
+        Buckets emptied by cancellation are kept until their time, so that
+        rescheduling into them does not need another heap entry."""
+        self._bucket_heap = []
+        """Heap of all keys of _buckets"""
+        self._timer = None
+        """asyncio handle for the next _tick"""
+        self._timer_bucket = None
+        """Bucket that _timer will process"""
+
+    def call_later(self, delay, callback):
+        """Arrange for the callback to be called after delay seconds (or up to
+        one granularity later). Returns a handle with a ``.cancel()`` method,
+        like the event loop's call_later."""
+        loop = asyncio.get_running_loop()
+        bucket = math.ceil((loop.time() + delay) / self.granularity)
+
+        handle = TimeoutWheelHandle(self, bucket, callback)
+        try:
+            self._buckets[bucket].add(handle)
+        except KeyError:
+            self._buckets[bucket] = {handle}
+            heapq.heappush(self._bucket_heap, bucket)
+            if self._timer_bucket is None or bucket < self._timer_bucket:
+                self._set_timer(loop, bucket)
+        return handle
+
+    def cancel_all(self):
+        """Cancel all pending callbacks and stop the timer"""
+        for bucket in self._buckets.values():
+            for handle in bucket:
+                handle._cancelled = True
+        self._buckets = {}
+        self._bucket_heap = []
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = self._timer_bucket = None
+
+    def _set_timer(self, loop, bucket):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = loop.call_at(bucket * self.granularity, self._tick)
+        self._timer_bucket = bucket
+
+    def _remove(self, handle):
+        bucket = self._buckets.get(handle._bucket)
+        if bucket is not None:
+            bucket.discard(handle)
+
+    def _tick(self):
+        loop = asyncio.get_running_loop()
+
+        # The event loop may run the timer marginally early (within its clock
+        # resolution), so the bucket the timer was set for is due in any case.
+        due = max(self._timer_bucket, math.floor(loop.time() / self.granularity))
+        self._timer = self._timer_bucket = None
+
+        heap = self._bucket_heap
+        while heap and heap[0] <= due:
+            for handle in self._buckets.pop(heapq.heappop(heap)):
+                # A callback may have cancelled handles of the same bucket
+                if handle._cancelled:
+                    continue
+                handle._cancelled = True
+                try:
+                    handle._callback()
+                except Exception as e:
+                    loop.call_exception_handler({
+                        'message': 'Exception in TimeoutWheel callback',
+                        'exception': e,
+                        'handle': handle,
+                        })
+
+        if heap and (self._timer_bucket is None or heap[0] < self._timer_bucket):
+            self._set_timer(loop, heap[0])
+
+class TimeoutWheelHandle:
+    """Handle returned by :meth:`TimeoutWheel.call_later`"""
+
+    __slots__ = ('_wheel', '_bucket', '_callback', '_cancelled')
+
+    def __init__(self, wheel, bucket, callback):
+        self._wheel = wheel
+        self._bucket = bucket
+        self._callback = callback
+        self._cancelled = False
+
+    def __repr__(self):
+        return '<%s for %r%s>' % (type(self).__name__, self._callback, ' cancelled' if self._cancelled else '')
+
+    def cancel(self):
+        """Prevent the callback from being called. This is idempotent, and may
+        also be called after the callback ran."""
+        if not self._cancelled:
+            self._cancelled = True
+            self._wheel._remove(self)
@@ -12,6 +12,7 @@ specification against it.
 
 import asyncio
 import unittest
+import urllib.parse
 
 import aiocoap
 from aiocoap.util import hostportjoin
@@ -82,4 +83,142 @@ class TestDiscovery(WithResourceDirectory, WithClient):
         self.assertEqual(response.code, aiocoap.CREATED, "Registration did not result in Created")
         self.assertTrue(len(response.opt.location_path) > 0, "Registration did not result in non-empty registration resource")
 
+    async def _register(self, query, payload):
+        """Register with the given query and link-format payload, and return
+        the URI of the registration resource"""
+        request = aiocoap.Message(
+                code=aiocoap.POST,
+                uri=(await self._get_endpoint('core.rd')) + '?' + query,
+                content_format=40,
+                payload=payload,
+                )
+        response = await self.client.request(request).response
+        self.assertEqual(response.code, aiocoap.CREATED, "Registration did not result in Created")
+        return 'coap://%s/%s' % (self.rd_netloc, '/'.join(response.opt.location_path))
+
+    async def _lookup(self, rt, query):
+        """Run a lookup on the interface of the given rt, and return the
+        response code and the links"""
+        request = aiocoap.Message(code=aiocoap.GET, uri=(await self._get_endpoint(rt)) + '?' + query)
+        response = await self.client.request(request).response
+        if not response.code.is_successful():
+            return response.code, None
+        return response.code, link_header.parse(response.payload.decode('utf8')).links
+
+    async def _lookup_eps(self, query):
+        """Run an endpoint lookup and return the ep names found"""
+        code, links = await self._lookup('core.rd-lookup-ep', query)
+        self.assertEqual(code, aiocoap.CONTENT, "Endpoint lookup %r failed" % query)
+        return sorted(v for l in links for (k, v) in l.attr_pairs if k == 'ep')
+
+    async def _lookup_paths(self, query):
+        """Run a resource lookup and return the paths of the found links"""
+        code, links = await self._lookup('core.rd-lookup-res', query)
+        self.assertEqual(code, aiocoap.CONTENT, "Resource lookup %r failed" % query)
+        return sorted(urllib.parse.urlparse(l.href).path for l in links)
+
+    @_skip_unless_linkheader
+    @asynctest
+    async def test_lookup_multiple_keys(self):
+        await self._register('ep=node1', b'</sensors/light>;rt="light-lux";if="sensor"')
+        await self._register('ep=node2', b'</actuators/light>;rt="light-lux";if="actuator"')
+
+        self.assertEqual(await self._lookup_eps('rt=light*&if=actuator'), ['node2'])
+        self.assertEqual(await self._lookup_eps('if=sensor&rt=light*'), ['node1'])
+        self.assertEqual(await self._lookup_eps('ep=node1&if=actuator'), [])
+        self.assertEqual(await self._lookup_paths('rt=light-lux&if=actuator'), ['/actuators/light'])
+        self.assertEqual(await self._lookup_paths('ep=node1&rt=light-lux'), ['/sensors/light'])
+
+    @_skip_unless_linkheader
+    @asynctest
+    async def test_lookup_tokens(self):
+        await self._register('ep=node1', b'</sensors/temp>;rt="temperature-c light-lux";if="sensor"')
+
+        self.assertEqual(await self._lookup_paths('rt=light-lux'), ['/sensors/temp'])
+        self.assertEqual(await self._lookup_paths('rt=temperature-c'), ['/sensors/temp'])
+        self.assertEqual(await self._lookup_paths('rt=light'), [], "Exact match on token prefix")
+        self.assertEqual(await self._lookup_paths('rt=light*'), ['/sensors/temp'])
+        self.assertEqual(await self._lookup_paths('rt=lux*'), [], "Wildcard match inside token")
+        self.assertEqual(await self._lookup_paths('rt=*'), ['/sensors/temp'])
+        self.assertEqual(await self._lookup_paths('if=sens*'), ['/sensors/temp'])
+        self.assertEqual(await self._lookup_eps('rt=temp*'), ['node1'])
+        self.assertEqual(await self._lookup_eps('rt=temp'), [])
+
+    @_skip_unless_linkheader
+    @asynctest
+    async def test_lookup_pagination(self):
+        await self._register('ep=node1', b'</a>;rt="x",</b>;rt="x",</c>;rt="x"')
+
+        all_paths = await self._lookup_paths('rt=x')
+        self.assertEqual(all_paths, ['/a', '/b', '/c'])
+
+        self.assertEqual(len(await self._lookup_paths('rt=x&count=2')), 2)
+        self.assertEqual(len(await self._lookup_paths('rt=x&page=1&count=2')), 1)
+        self.assertEqual(len(await self._lookup_paths('rt=x&page=2&count=2')), 0)
+        self.assertEqual(
+                sorted(await self._lookup_paths('rt=x&page=0&count=2') + await self._lookup_paths('rt=x&page=1&count=2')),
+                all_paths,
+                "Pages do not add up to the full result")
+
+        for query in ('page=1', 'page=-1&count=2', 'count=-1', 'count=x'):
+            code, _ = await self._lookup('core.rd-lookup-res', query)
+            self.assertEqual(code, aiocoap.BAD_REQUEST, "Bad pagination %r not rejected" % query)
+
+    @_skip_unless_linkheader
+    @asynctest
+    async def test_lookup_after_update(self):
+        registration = await self._register('ep=node1', b'</old>;rt="x"')
+
+        self.assertEqual(await self._lookup_paths('rt=x'), ['/old'])
+
+        request = aiocoap.Message(
+                code=aiocoap.PUT,
+                uri=registration,
+                content_format=40,
+                payload=b'</new>;rt="x"',
+                )
+        response = await self.client.request(request).response
+        self.assertEqual(response.code, aiocoap.CHANGED, "Registration update did not result in Changed")
+
+        self.assertEqual(await self._lookup_paths('rt=x'), ['/new'], "Lookup result is stale after update")
+
     # FIXME: there are many more things to be tested here
+
+class _AnonymousRemote:
+    """Stand-in for the remote of a client that can not be reached by its
+    address, like a TCP or WebSocket client"""
+    @property
+    def uri(self):
+        raise aiocoap.error.AnonymousHost
+
+class _NamedRemote:
+    uri = 'coap://[2001:db8::1]'
+
+class TestRegistrationPaths(WithAsyncLoop):
+    @_skip_unless_linkheader
+    @asynctest
+    async def test_rejected_registrations_keep_paths(self):
+        rd = aiocoap.cli.rd.CommonRD()
+
+        for _ in range(3):
+            with self.assertRaises(aiocoap.error.BadRequest):
+                rd.initialize_endpoint(_AnonymousRemote(), {'ep': ['a']})
+
+        reg_a = rd.initialize_endpoint(_NamedRemote(), {'ep': ['a']})
+        self.assertEqual(reg_a.path, ('reg', '1', ''), "Rejected registrations consumed a path")
+
+        reg_b = rd.initialize_endpoint(_NamedRemote(), {'ep': ['b']})
+        self.assertEqual(reg_b.path, ('reg', '2', ''))
+
+        with self.assertRaises(aiocoap.error.BadRequest):
+            rd.initialize_endpoint(_AnonymousRemote(), {'ep': ['b']})
+        self.assertIs(rd._by_path[('2', '')], reg_b, "Rejected re-registration removed the registration")
+
+        reg_c = rd.initialize_endpoint(_NamedRemote(), {'ep': ['c']})
+        self.assertEqual(reg_c.path, ('reg', '3', ''))
+
+        reg_a.delete()
+        reg_d = rd.initialize_endpoint(_NamedRemote(), {'ep': ['d']})
+        self.assertEqual(reg_d.path, ('reg', '1', ''), "Freed path was not reused")
+
+        await rd.shutdown()
@@ -0,0 +1,70 @@
+# This file is part of the Python aiocoap library project.
+#
+# Copyright (c) 2012-2014 Maciej Wasilak <http://sixpinetrees.blogspot.com/>,
+#               2013-2014 Christian Amsüss <c.amsuess@energyharvesting.at>
+#
+# aiocoap is free software, this file is published under the MIT license as
+# described in the accompanying LICENSE file.
+
+import asyncio
+
+from aiocoap.util.asyncio.timeoutwheel import TimeoutWheel
+
+from .fixtures import WithAsyncLoop, asynctest
+
+class TestTimeoutWheel(WithAsyncLoop):
+    @asynctest
+    async def test_expiry_and_cancellation(self):
+        granularity = 0.05
+        wheel = TimeoutWheel(granularity)
+        fired = []
+
+        wheel.call_later(granularity * 2, lambda: fired.append("short"))
+        wheel.call_later(granularity * 2, lambda: fired.append("short2"))
+        wheel.call_later(granularity * 6, lambda: fired.append("long"))
+        cancelled = wheel.call_later(granularity * 2, lambda: fired.append("cancelled"))
+        cancelled.cancel()
+
+        await asyncio.sleep(granularity)
+        self.assertEqual(fired, [], "Callbacks fired early")
+
+        await asyncio.sleep(granularity * 3)
+        self.assertEqual(sorted(fired), ["short", "short2"])
+
+        await asyncio.sleep(granularity * 4)
+        self.assertEqual(sorted(fired), ["long", "short", "short2"])
+
+    @asynctest
+    async def test_refresh(self):
+        granularity = 0.05
+        wheel = TimeoutWheel(granularity)
+        fired = []
+
+        handle = wheel.call_later(granularity * 2, lambda: fired.append(1))
+        for _ in range(4):
+            await asyncio.sleep(granularity)
+            handle.cancel()
+            handle = wheel.call_later(granularity * 2, lambda: fired.append(1))
+        self.assertEqual(fired, [], "Refreshed callback fired")
+
+        # A bucket earlier than any present needs to pull the timer forward
+        wheel.call_later(0, lambda: fired.append(0))
+        await asyncio.sleep(granularity)
+        self.assertEqual(fired, [0])
+
+        await asyncio.sleep(granularity * 3)
+        self.assertEqual(fired, [0, 1])
+
+        handle.cancel() # idempotent after firing
+
+    @asynctest
+    async def test_cancel_all(self):
+        granularity = 0.05
+        wheel = TimeoutWheel(granularity)
+        fired = []
+
+        wheel.call_later(granularity, lambda: fired.append(1))
+        wheel.cancel_all()
+
+        await asyncio.sleep(granularity * 3)
+        self.assertEqual(fired, [])